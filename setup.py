@@ -38,7 +38,10 @@ setup(
 
     install_requires=[
         'climada==4.1.1',
+        'contourpy',
+        'orjson',
         'pydantic',
+        'pyogrio',
     ],
 
     extras_require={
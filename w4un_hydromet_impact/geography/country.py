@@ -1,4 +1,5 @@
 # disable pylint because of: No name 'PositiveInt' in module 'pydantic'
+from functools import lru_cache
 from typing import Iterable
 
 from pydantic import PositiveInt, Field  # pylint: disable=[E0611]
@@ -23,9 +24,11 @@ class Country:
         return f'{self.numeric} ({self.name})'
 
 
+@lru_cache(maxsize=512)
 def create_country_from_identifier(identifier: "str | int") -> Country:
     """
     Loads a country reference from an identifier (numeric code, alpha3 code or name).
+    The result is cached because countries are immutable and resolved repeatedly for the same identifier.
     """
     return Country(numeric=country_to_iso(identifier, 'numeric'),
                    alpha3=country_to_iso(identifier),
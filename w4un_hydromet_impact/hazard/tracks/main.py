@@ -18,7 +18,8 @@ from shapely.geometry.base import BaseGeometry
 from climada.hazard import TCTracks
 from w4un_hydromet_impact.hazard.tracks.data import Track, Point
 from w4un_hydromet_impact.hazard.tracks.util import build_frequencies
-from w4un_hydromet_impact.util.distances import calculate_distance_between_point_and_geometry
+from w4un_hydromet_impact.util.distances import calculate_distance_between_point_and_geometry, \
+    calculate_distances_between_points_and_geometry
 from w4un_hydromet_impact.util.types import FloatingArray, IntegerArray, TimestampArray, Timestamp
 
 
@@ -122,14 +123,14 @@ def find_closest_point(track: Track, geometry: BaseGeometry) -> tuple[Optional[T
     if not track:
         raise AssertionError('Track does not contain any points.')
 
-    closest_distance = float('inf')
-    closest_time = None
+    distances = calculate_distances_between_points_and_geometry(geometry, track.latitudes, track.longitudes)
 
-    for latitude, longitude, time in zip(track.latitudes, track.longitudes, track.times):
-        distance = calculate_distance_between_point_and_geometry(geometry,
-                                                                 latitude, longitude)
-        if distance <= closest_distance:
-            closest_distance = distance
-            closest_time = time
+    # points without a distance (NaN) are never the closest ones
+    valid_indices = np.flatnonzero(~np.isnan(distances))
+    if len(valid_indices) == 0:
+        return None, float('inf')
 
-    return closest_time, closest_distance
+    # the last one of several closest points wins
+    closest_index = valid_indices[len(valid_indices) - 1 - np.argmin(distances[valid_indices][::-1])]
+
+    return track.times[closest_index], float(distances[closest_index])
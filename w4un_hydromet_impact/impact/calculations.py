@@ -77,7 +77,8 @@ def _perform_impact_calculation(hazard: Hazard,  # pylint: disable=[R0913]
     lead_times = hazard_metadata.get_lead_times(country.numeric)
     # median timestamp of landfall in country
     event_date = datetime64_to_ordinal(lead_times.median)
-    hazard.date[:] = event_date
+    # same as hazard.date[:] = event_date, but fill uses a plain memory fill instead of broadcasting
+    hazard.date.fill(event_date)
 
     # extract the initialization time of the weather forecast data
     forecast_run = convert_datetime64_to_datetime(hazard_metadata.initialisation_time)
@@ -1,4 +1,5 @@
 import logging
+from functools import lru_cache
 from typing import Optional
 
 from climada.entity import Exposures
@@ -32,11 +33,24 @@ def download_exposures(country: Country) -> Exposures:
                                                                     }
                                                         )
             )[1][0]
-    exposures = Exposures.from_hdf5(path)
+    # the cached exposures are shared, so hand out a copy the impact calculation may modify
+    exposures = _read_exposures_file(str(path)).copy(deep=True)
 
     return exposures
 
 
+@lru_cache(maxsize=1)
+def _read_exposures_file(path: str) -> Exposures:
+    """
+    Reads the exposures from the specified HDF5 file.
+    Only the most recently read exposures are cached so that repeated calculations for the same country
+    parse the file only once without keeping the exposures of several countries in memory.
+    A cached entry is never invalidated, i.e. changes to the file at the same path are not picked up.
+    """
+    logger.debug('Reading exposures from %s', path)
+    return Exposures.from_hdf5(path)
+
+
 def exposures_file_name_by_country(country_id: "str | int", impact_type: str) -> str:
     """
     Derives the name of exposure file from impact type and country.
@@ -1,6 +1,7 @@
 from typing import Any, Literal, Tuple, Optional, Sized
 
 import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix
 from typing_extensions import Self
 
 from w4un_hydromet_impact import CONFIG
@@ -132,6 +133,20 @@ class ProbabilityPoints(Sized):
         return [ValuedPoint(latitude=latitude, longitude=longitude, value=probability)
                 for latitude, longitude, probability in zip(self._latitudes, self._longitudes, self._probabilities)]
 
+    def to_sparse_matrix(self, resolution: Point) -> csr_matrix:
+        """
+        Builds a sparse matrix of the probabilities without creating a valued point per entry.
+        The rows are associated with the latitude values, the columns with the longitude values,
+        both starting at the minimum value and advancing by the specified resolution (in arc milliseconds).
+        """
+        if not len(self):
+            return csr_matrix((0, 0), dtype=self._probabilities.dtype)
+
+        rows = np.rint((self._latitudes - self._latitudes.min()) / resolution.latitude).astype(np.intp)
+        columns = np.rint((self._longitudes - self._longitudes.min()) / resolution.longitude).astype(np.intp)
+        return coo_matrix((self._probabilities, (rows, columns)),
+                          shape=(rows.max() + 1, columns.max() + 1)).tocsr()
+
 
 # Type definition for the values of a grid:
 # a 2-dimensional array of floats
@@ -193,9 +208,9 @@ class Grid:
 
     @staticmethod
     def _calculate_coordinates(start: Point, resolution: Point, values: Values) -> Coordinates:
-        return np.array(
-            [[start.latitude + resolution.latitude * lat_index, start.longitude + resolution.longitude * lon_index]
-             for lat_index, lon_index in np.ndindex(*values.shape)])
+        latitudes = start.latitude + resolution.latitude * np.arange(values.shape[0])
+        longitudes = start.longitude + resolution.longitude * np.arange(values.shape[1])
+        return np.column_stack((np.repeat(latitudes, values.shape[1]), np.tile(longitudes, values.shape[0])))
 
     @property
     def values(self) -> Values:
@@ -231,6 +246,13 @@ class Grid:
         """
         return from_arc_milliseconds(self._coordinates[:, 1]).reshape(self._values.shape)[0, :]
 
+    def flat_latitudes_and_longitudes(self) -> tuple[FloatingArray, FloatingArray]:
+        """
+        Returns the latitude and the longitude values in degrees associated with the values row-by-row
+        as two separate arrays, e.g. to construct a sparse matrix without gathering the coordinates.
+        """
+        return np.repeat(self.latitudes, self._values.shape[1]), np.tile(self.longitudes, self._values.shape[0])
+
     def with_new_values(self, new_values: Values) -> Self:
         """
         Creates a new grid with the specified values and the same coordinates.
@@ -244,14 +266,10 @@ class Grid:
                               resolution=self._resolution)
 
     def has_border(self) -> bool:
-        # first column
-        return (all(value == 0 for value in self._values[0, :])
-                # last column
-                and all(value == 0 for value in self._values[-1, :])
-                # first row
-                and all(value == 0 for value in self._values[:, 0])
-                # last row
-                and all(value == 0 for value in self._values[:, -1]))
+        # first and last row
+        return (not self._values[[0, -1], :].any()
+                # first and last column
+                and not self._values[:, [0, -1]].any())
 
     def add_border(self, border_size: int = 1) -> Self:
         new_values = np.pad(self._values, pad_width=border_size)
@@ -268,7 +286,10 @@ class Grid:
 
 
 def to_arc_milliseconds(values: FloatingArray) -> IntegerArray:
-    return np.round(np.multiply(values, _ARC_MILLISECONDS_PER_DEGREE)).astype(int)
+    # round in place to avoid allocating a temporary array per step
+    arc_milliseconds = np.multiply(values, _ARC_MILLISECONDS_PER_DEGREE, dtype=np.float64)
+    np.rint(arc_milliseconds, out=arc_milliseconds)
+    return arc_milliseconds.astype(np.int64)
 
 
 def from_arc_milliseconds(values: IntegerArray) -> FloatingArray:
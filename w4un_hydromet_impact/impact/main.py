@@ -1,6 +1,7 @@
 import json
 import logging
 import re
+from functools import lru_cache
 from typing import Tuple
 
 import numpy as np
@@ -81,7 +82,7 @@ def _extract_one_and_only_capture_group_from_filename(filename: str, regexp: str
     """
     Extracts the only capture group from a filename using a provided regular expression pattern.
     """
-    match = re.match(regexp, filename)
+    match = _compile_regexp(regexp).match(filename)
     if match:
         if len(match.groups()) != 1:
             raise ValueError(f"Regular expression '{regexp}' should have exactly one capturing group.")
@@ -91,6 +92,13 @@ def _extract_one_and_only_capture_group_from_filename(filename: str, regexp: str
     raise ValueError(f'Filename {filename} does not match the regexp {regexp}.')
 
 
+@lru_cache(maxsize=None)
+def _compile_regexp(regexp: str) -> re.Pattern:
+    """
+    Compiles the specified regular expression once and reuses the pattern for subsequent calls.
+    """
+    return re.compile(regexp)
+
 
 def _create_impact_forecast_definition_item(
         calculate_impact_properties: CalculateImpactProperties) -> ImpactForecastDefinitionItem:
@@ -3,7 +3,7 @@
 This module provides functions to plot impact data.
 """
 import logging
-import os
+from functools import lru_cache
 from typing import Tuple, Optional
 
 import cartopy.crs as ccrs
@@ -11,11 +11,12 @@ import geopandas as gpd
 import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
+import scipy.sparse
 import shapely
 from matplotlib.figure import Figure
 
 import climada.entity
-from climada.engine import Impact
 from climada.engine.forecast import Forecast
 from w4un_hydromet_impact.cross_section.exceptions import ClimadaError
 from w4un_hydromet_impact.exchange.buckets import s3_location_for_impact_file
@@ -34,9 +35,12 @@ def plot_impact_forecast(impact_forecast: Forecast, impact_type: str) -> tuple[S
     Plots the results of the impact calculation (map and histogram) and stores them
     in S3's ch.meteoswiss.hydrometimpact.impact bucket.
     """
+    # shared by both plots
+    forecast_name = impact_forecast.summary_str()
+    description = _transform_to_description(impact_type)
 
     # save map of impact forecast
-    map_plot = _plot_impact_map(impact_forecast, impact_type)
+    map_plot = _plot_impact_map(impact_forecast, impact_type, forecast_name, description)
     file_name_map = build_file_name_from_impact_forecast(impact_forecast,
                                                          impact_type,
                                                          'map.jpeg')
@@ -44,7 +48,7 @@ def plot_impact_forecast(impact_forecast: Forecast, impact_type: str) -> tuple[S
     upload_figure(map_plot, s3_location_map)
 
     # save histogram of impact forecast
-    histogram_plot = _plot_impact_histogram(impact_forecast, impact_type)
+    histogram_plot = _plot_impact_histogram(impact_forecast, impact_type, forecast_name, description)
     file_name_histogram = build_file_name_from_impact_forecast(impact_forecast,
                                                                impact_type,
                                                                'histogram.png')
@@ -54,38 +58,41 @@ def plot_impact_forecast(impact_forecast: Forecast, impact_type: str) -> tuple[S
     return s3_location_map, s3_location_histogram
 
 
-def _plot_impact_map(impact_forecast: Forecast, impact_type: str) -> Figure:
+def _plot_impact_map(impact_forecast: Forecast, impact_type: str, forecast_name: str, description: str) -> Figure:
     """
     Plots the specified impact forecast as a map.
     :param impact_forecast: the impact forecast
     :param impact_type: the impact type
+    :param forecast_name: the summary string of the impact forecast
+    :param description: the description of the impact type
     :return: a figure representing the plotted map
     """
     logger.info('Trying to plot impact forecast as map.')
 
-    forecast_name = impact_forecast.summary_str()
     try:
         # avoid saving and closing the plotted figure directly because we want to upload it into S3
         return impact_forecast.plot_imp_map(save_fig=False, close_fig=False,
-                                            explain_str=_transform_to_description(impact_type))[0][0].figure
+                                            explain_str=description)[0][0].figure
     except Exception as error:
         raise ClimadaError(f'Cannot plot impact map: {forecast_name}_{impact_type}') from error
 
 
-def _plot_impact_histogram(impact_forecast: Forecast, impact_type: str) -> Figure:
+def _plot_impact_histogram(impact_forecast: Forecast, impact_type: str, forecast_name: str,
+                           description: str) -> Figure:
     """
     Plots the specified impact forecast as a histogram.
     :param impact_forecast: the impact forecast
     :param impact_type: the impact type
+    :param forecast_name: the summary string of the impact forecast
+    :param description: the description of the impact type
     :return: a figure representing the plotted histogram
     """
     logger.info('Trying to plot impact forecast as histogram.')
 
-    forecast_name = impact_forecast.summary_str()
     try:
         # avoid saving and closing the plotted figure directly because we want to upload it into S3
         plot = impact_forecast.plot_hist(save_fig=False, close_fig=False,
-                                         explain_str=_transform_to_description(impact_type))
+                                         explain_str=description)
         return plot.figure
     except Exception as error:
         raise ClimadaError(f'Cannot plot impact histogram: {forecast_name}_{impact_type}') from error
@@ -98,16 +105,26 @@ def _transform_to_description(string: str) -> str:
     return str.replace(string, '_', ' ')
 
 
-def _reshape_imps(imp: Impact, n_ens: int) -> Impact:
+def _reshape_imps(imp_list: list, n_ens: int) -> np.ndarray:
     """
-    reshape "linearized" impact events into matrix n_ens x n_lt. strictly only necessary
-    form impact objects that have various lead times and ensemble realizations mixed together.
-    :param imp:
+    reshape "linearized" impact events of all impact objects into one array n_imp x n_ens x n_lt x n_exp.
+    strictly only necessary form impact objects that have various lead times and ensemble realizations mixed
+    together. the impact matrices are densified into a single preallocated array.
+    :param imp_list: list of Impact objects including imp_mat of equal shape
     :param n_ens:
     :return:
     """
-    n_lt = int(imp.imp_mat.shape[0] / n_ens)
-    return imp.imp_mat.A.reshape(n_ens, n_lt, -1)
+    imp_list = list(imp_list)
+    n_events, n_exp = imp_list[0].imp_mat.shape
+    n_lt = int(n_events / n_ens)
+
+    dense = np.empty((len(imp_list), n_events, n_exp))
+    for index, imp in enumerate(imp_list):
+        if scipy.sparse.issparse(imp.imp_mat):
+            imp.imp_mat.toarray(out=dense[index])
+        else:
+            dense[index] = np.asarray(imp.imp_mat)
+    return dense.reshape(len(imp_list), n_ens, n_lt, -1)
 
 
 def _get_impact_percentiles_per_severity_level(imp_list: list,
@@ -122,15 +139,16 @@ def _get_impact_percentiles_per_severity_level(imp_list: list,
     :return dict_imp_perc: with keys 2-5 representing severity levels, and nd-arrays representing corresponding
     percentiles as specified in kwarg percentiles
     """
-    dict_impacts = dict(
-        zip(range(2, 6), [_reshape_imps(imp, n_ens) for imp in imp_list]))
+    # stack the impacts of all severity levels to compute the percentiles with a single call
+    stacked_impacts = _reshape_imps(imp_list, n_ens)
 
-    dict_imp_perc = {}
-    for level in range(2, 6):
-        dict_imp_perc[level] = np.percentile(dict_impacts[level],
-                                             percentiles,
-                                             axis=0)
-    return dict_imp_perc
+    # same as np.percentile along the ensemble axis; the stacked impacts are a temporary and may be overwritten
+    impact_percentiles = np.quantile(stacked_impacts,
+                                     np.divide(percentiles, 100),
+                                     axis=1,
+                                     overwrite_input=True)
+
+    return {level: impact_percentiles[:, index] for index, level in enumerate(range(2, 6))}
 
 
 def _assign_warnreg2exp(exp: climada.entity.Exposures, gdf_warnregs: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
@@ -188,16 +206,25 @@ def _load_shape_file_of_switzerland(single_regions: bool = False, reproj_epsg: O
     :param reproj_epsg: the projection to re-project to (in epsg code)
     :return:
     """
-    print("FZFZ: " + os.getcwd())
-    print("FZFZ: " + os.path.realpath(__file__))
-    gdf_warnregs = gpd.read_file(PATH_AUX + 'MCH_Warnreg_v2_3_LV95_red.shp')
+    # return a copy since callers may modify the cached geo object
+    return _load_shape_file_of_switzerland_cached(single_regions, reproj_epsg).copy()
+
+
+@lru_cache(maxsize=8)
+def _load_shape_file_of_switzerland_cached(single_regions: bool, reproj_epsg: Optional[int]) -> gpd:
+    """
+    load shape file of warning regions only once per combination of arguments (see _load_shape_file_of_switzerland)
+    """
+    # only the region number is used besides the geometry
+    gdf_warnregs = gpd.read_file(PATH_AUX + 'MCH_Warnreg_v2_3_LV95_red.shp',
+                                 engine='pyogrio',
+                                 columns=['REGION_NR'])
 
     if reproj_epsg is not None:
         gdf_warnregs = gdf_warnregs.to_crs(epsg=reproj_epsg)
     if single_regions:
         return gdf_warnregs
-    return gpd.GeoSeries(shapely.ops.unary_union(
-        [geom for geom in gdf_warnregs.geometry]).exterior,
+    return gpd.GeoSeries(shapely.unary_union(gdf_warnregs.geometry.to_numpy()).exterior,
                          crs=gdf_warnregs.crs)
 
 
@@ -221,18 +248,21 @@ def plot_impact_percentile_maps_of_switzerland(dict_impact_objects: dict,
 
     vmin = 0
     vmax = np.max(dict_impact_object_perc[2].flatten().max())
+    # all subplots share the same color norm
+    norm = matplotlib.colors.SymLogNorm(1, vmin=vmin, vmax=vmax)
+
+    # project the exposure coordinates once since all subplots share the same projection
+    coord_exp = dict_impact_objects[2].coord_exp
+    projected_coord_exp = axes[0].projection.transform_points(ccrs.PlateCarree(), coord_exp[:, 1], coord_exp[:, 0])
 
     for ax, level in zip(axes, range(2, 6)):
         border_che.plot(facecolor='none', edgecolor='0.5', ax=ax)
-        pcm = ax.scatter(dict_impact_objects[2].coord_exp[:, 1],
-                         dict_impact_objects[2].coord_exp[:, 0],
+        pcm = ax.scatter(projected_coord_exp[:, 0],
+                         projected_coord_exp[:, 1],
                          c=dict_impact_object_perc[level].flatten(),
                          s=0.2,
-                         transform=ccrs.PlateCarree(),
                          cmap='PuRd',
-                         norm=matplotlib.colors.SymLogNorm(1,
-                                                           vmin=vmin,
-                                                           vmax=vmax))
+                         norm=norm)
         ax.set_title(f'severity level >={level}')
 
         fig.colorbar(pcm, shrink=0.5, ax=ax)
@@ -265,21 +295,25 @@ def plot_impact_percentile_maps_warning_regions_of_switzerland(dict_impact_objec
     gdf_warnregs = _load_shape_file_of_switzerland(single_regions=True,
                                                    reproj_epsg=4326)
 
-    centroids = gpd.GeoDataFrame(
-        geometry=gpd.points_from_xy(dict_impact_objects[2].coord_exp[:, 1],
-                                    dict_impact_objects[2].coord_exp[:, 0],
-                                    crs='epsg:4326'))
-    centroids = centroids.sjoin(gdf_warnregs, how='left',
-                                predicate='within').set_index('REGION_NR')
+    # match the exposure points with the warning regions they lie within
+    coord_exp = dict_impact_objects[2].coord_exp
+    points = shapely.points(coord_exp[:, 1], coord_exp[:, 0])
+    tree = shapely.STRtree(gdf_warnregs.geometry.values)
+    point_indices, row_indices = tree.query(points, predicate='within')
+    # a warning region may consist of several rows of the shape file
+    region_codes, region_numbers = pd.factorize(gdf_warnregs['REGION_NR'])
     gdf_warnregs = gdf_warnregs.set_index('REGION_NR')
 
     axes, fig = create_aggregate_figure()
 
     for level in range(2, 6):
-        centroids[level] = dict_impact_object_perc[level].flatten()
-        gdf_warnregs[level] = centroids.groupby('REGION_NR')[level].sum()
+        # sum up the impacts per warning region and assign the sum to all of its rows;
+        # regions without any point get 0
+        region_sums = np.bincount(region_codes[row_indices],
+                                  weights=dict_impact_object_perc[level].ravel()[point_indices],
+                                  minlength=len(region_numbers))
+        gdf_warnregs[level] = region_sums[region_codes]
 
-    gdf_warnregs.fillna(0, inplace=True)
     vmin = 0
     vmax = np.max(gdf_warnregs[2])
 
@@ -2,13 +2,14 @@
 Module to create polygons from impacts.
 """
 import logging
+from functools import lru_cache
 from typing import Optional
 
+import contourpy
 import numpy as np
+import shapely
 from geopandas import GeoSeries
-from matplotlib import pyplot as plt
-from matplotlib.path import Path
-from shapely import Polygon, MultiPolygon
+from shapely import Polygon
 
 from climada.engine import Impact
 from climada.engine.forecast import Forecast
@@ -16,27 +17,27 @@ from climada_petals.engine.warn import Warn, Operation
 from w4un_hydromet_impact import CONFIG
 from w4un_hydromet_impact.impact.grid import ProbabilityPoints, Grid
 
-# do not create a figure with matplotlib
-plt.ioff()
-
 logger = logging.getLogger(__name__)
 
-POLYGON_LINE_WIDTH = 1.0
-POLYGON_LINE_STYLE = ':'
-POLYGON_COLOR = '#525252'
+# The warn levels applied when converting a grid to a polygon.
+# The second entry represents the minimum probability to be considered.
+_WARN_LEVELS = (0, CONFIG.climada.impact.probability_threshold)
 
 
-def create_polygons_from_impact(impact_forecast: Forecast) -> GeoSeries:
+def create_polygons_from_impact(impact_forecast: Forecast, impact: Optional[Impact] = None) -> GeoSeries:
     """
     Creates polygons representing the areas covered by the specified impact (forecast).
+    The impact of the forecast may be passed if it has already been extracted.
     """
-    if len(impact_forecast._impact) != 1:
-        raise AssertionError(f'Impact forecast does not contain exactly 1 impact, but: {len(impact_forecast._impact)}')
-    impact = impact_forecast._impact[0]
+    if impact is None:
+        if len(impact_forecast._impact) != 1:
+            raise AssertionError(
+                f'Impact forecast does not contain exactly 1 impact, but: {len(impact_forecast._impact)}')
+        impact = impact_forecast._impact[0]
 
     points = _convert_impact_to_probability_points(impact)
 
-    if any(probability > 0 for probability in points.probabilities):
+    if points.probabilities.max(initial=0.0) > 0:
         probability_grid = _transform_probability_points_to_grid(points)
 
         minimum_grid = _ensure_minimum_grid(probability_grid)
@@ -61,9 +62,10 @@ def _convert_impact_to_probability_points(impact: Impact) -> ProbabilityPoints:
     """
     Calculates all points affected by the specified impact associated with their probability that they are affected.
     """
-    # probability of impact
-    values = (impact.imp_mat > 0).sum(axis=0) / impact.imp_mat.shape[0]
-    values = np.asarray(values).ravel()
+    # probability of impact: count the positive entries per column directly on the sparse structure
+    imp_mat = impact.imp_mat.tocsr()
+    affected_count = np.bincount(imp_mat.indices[imp_mat.data > 0], minlength=imp_mat.shape[1])
+    values = affected_count / imp_mat.shape[0]
 
     return ProbabilityPoints(latitudes=impact.coord_exp[:, 0],
                              longitudes=impact.coord_exp[:, 1],
@@ -96,20 +98,14 @@ def _ensure_minimum_grid(grid: Grid) -> Grid:
     return grid.add_border(required_border)
 
 
-def _warn_levels() -> list[float]:
-    """
-    The warn levels applied when converting a grid to a polygon.
-    The second entry represents the minimum probability to be considered.
-    """
-    return [0, CONFIG.climada.impact.probability_threshold]
-
-
-def _apply_warn_parameters(grid: Grid) -> Grid:
+@lru_cache(maxsize=1)
+def _warn_parameters() -> Warn.WarnParameters:
     """
-    Applies the warning parameters to the specified grid. The resulting grid contains only 0 or 1 values.
+    The warning parameters applied to a grid.
+    They are built only once because the configuration does not change at runtime.
     """
-    warn_parameters = Warn.WarnParameters(
-        _warn_levels(),
+    return Warn.WarnParameters(
+        list(_WARN_LEVELS),
         operations=[
             (Operation.erosion, CONFIG.climada.impact.warn.erosion),
             (Operation.dilation, CONFIG.climada.impact.warn.dilation),
@@ -118,7 +114,13 @@ def _apply_warn_parameters(grid: Grid) -> Grid:
         gradual_decr=CONFIG.climada.impact.warn.gradually_decreased,
         change_sm=CONFIG.climada.impact.warn.small_regions_threshold
     )
-    warn_def = Warn.from_map(grid.values, grid.coordinates, warn_parameters)
+
+
+def _apply_warn_parameters(grid: Grid) -> Grid:
+    """
+    Applies the warning parameters to the specified grid. The resulting grid contains only 0 or 1 values.
+    """
+    warn_def = Warn.from_map(grid.values, grid.coordinates, _warn_parameters())
     return grid.with_new_values(warn_def.warning)
 
 
@@ -137,70 +139,21 @@ def _create_polygons_from_grid(grid: Grid) -> list[Polygon]:
     """
     Calculates the polygons represented by the specified grid. The polygons may have holes.
     """
-    # create contour
-    contour = plt.contour(grid.longitudes, grid.latitudes, grid.values,
-                          linewidths=POLYGON_LINE_WIDTH, linestyles=POLYGON_LINE_STYLE,
-                          levels=_warn_levels(), colors=[POLYGON_COLOR])
-
-    # create polygons
-    ### copied from
-    ### https://gis.stackexchange.com/questions/99917/converting-matplotlib-contour-objects-to-shapely-objects
-    ### user kpenner
-
-    # we have two contours and take the second one because it's above our warn level
-    multi_poly = None
-    collection = contour.collections[-1]
-
-    for path in collection.get_paths():
-        poly = _create_polygon_from_path(path)
-        if not poly:
-            continue
-        if multi_poly is None:
-            multi_poly = poly
-        else:
-            multi_poly = multi_poly.union(poly)
-
-    if multi_poly is None:
-        return []
-    if isinstance(multi_poly, Polygon):
-        return [multi_poly]
-    if isinstance(multi_poly, MultiPolygon):
-        return multi_poly.geoms
-    raise ValueError(f'Unexpected polygon: {multi_poly}')
-
+    # create the filled contours above our warn level without setting up a matplotlib figure;
+    # each filled contour is given by its outer ring followed by its holes
+    contour_generator = contourpy.contour_generator(grid.longitudes, grid.latitudes, grid.values,
+                                                    fill_type=contourpy.FillType.OuterOffset)
+    points_per_contour, offsets_per_contour = contour_generator.filled(_WARN_LEVELS[-1], np.inf)
 
-def _create_polygon_from_path(path: Path) -> Optional[Polygon]:
-    polygons = path.to_polygons()
+    polygons = [Polygon(points[offsets[0]:offsets[1]],
+                        holes=[points[start:end] for start, end in zip(offsets[1:-1], offsets[2:])])
+                for points, offsets in zip(points_per_contour, offsets_per_contour)]
     if not polygons:
-        return None
-    # in case several arrays are returned by path.to_polygons(), combine them
-    if len(polygons) > 1:
-        polygons_combined = np.empty(0)
-        for single in polygons:
-            if len(polygons_combined):
-                polygons_combined = np.concatenate([polygons_combined, single])
-            else:
-                polygons_combined = single
-        polygons = [polygons_combined]
-
-
-    poly = None
-    for poly_points in polygons:
-        poly_longitudes = poly_points[:, 0]
-        poly_latitudes = poly_points[:, 1]
-        # be careful with the following---check to make sure
-        # your coordinate system expects lat first, lon second
-        poly_init = Polygon(list(zip(poly_longitudes, poly_latitudes)))
-        if poly_init.is_valid:
-            poly_clean = poly_init
-        else:
-            poly_clean = poly_init.buffer(0.)
-        if poly is None:
-            poly = poly_clean
-        else:
-            poly = poly.difference(poly_clean)
+        return []
 
-    return poly
+    # repair the invalid polygons keeping their polygonal parts only
+    polygons = shapely.get_parts(shapely.make_valid(np.asarray(polygons)))
+    return list(polygons[shapely.get_type_id(polygons) == shapely.GeometryType.POLYGON])
 
 
 def _create_geo_series_from_polygons(polygons: list[Polygon], impact: Impact) -> GeoSeries:
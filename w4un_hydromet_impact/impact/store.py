@@ -1,12 +1,16 @@
 """
 This module provides functions to save impact data.
 """
-import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from decimal import ROUND_HALF_EVEN, ROUND_CEILING, ROUND_FLOOR, Context
-from typing import Any
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Sequence
 
-from statsmodels.stats.weightstats import DescrStatsW
+import numpy as np
+import orjson
+from scipy.sparse import save_npz
 
 from climada.engine import Impact
 from climada.engine.forecast import Forecast
@@ -25,6 +29,13 @@ logger = logging.getLogger(__name__)
 _ROUND = ROUND_HALF_EVEN
 _ROUND_UP = ROUND_CEILING
 _ROUND_DOWN = ROUND_FLOOR
+# the configuration is loaded once at import, so the number of significant digits is constant
+_SIGNIFICANT_DIGITS = CONFIG.climada.rounding.significant_digits
+
+# probabilities of the percentiles in the summary
+_PERCENTILE_PROBABILITIES = (0.05, 0.25, 0.5, 0.75, 0.95)
+# tolerance of the cumulative weight to be considered an exact hit of a percentile (as in DescrStatsW)
+_EXACT_HIT_TOLERANCE = 1e-10
 
 
 def save_impact_forecast(impact_forecast: Forecast,
@@ -39,35 +50,53 @@ def save_impact_forecast(impact_forecast: Forecast,
 
     impact_data = _extract_impact(impact_forecast)
 
-    # save impact forecast data
-    file_name_impact_data = base_path + '/' + build_file_name_from_impact_forecast(impact_forecast, impact_type, 'data.csv')
-    impact_data.write_csv(file_name_impact_data)
+    # the file names only differ in their suffix, so the forecast's summary is built once
+    file_name_prefix = base_path + '/' + build_file_name_from_impact_forecast(impact_forecast, impact_type, '')
+    file_name_impact_data = file_name_prefix + 'data.csv'
+    file_name_impact_matrix = file_name_prefix + 'matrix.npz'
+    file_name_summary = file_name_prefix + 'summary.json'
+    file_name_polygon = file_name_prefix + 'polygon.geojson'
+
+    summary = summarize_impact(impact_forecast, impact_data, impact_type, hazard_metadata, hazard_source)
 
-    # save impact forecast matrix
-    file_name_impact_matrix = base_path + '/' + build_file_name_from_impact_forecast(impact_forecast, impact_type, 'matrix.npz')
-    impact_data.write_sparse_csr(file_name_impact_matrix)
+    # the files are independent of each other, so write them concurrently
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        # save impact forecast data
+        future_data = executor.submit(impact_data.write_csv, file_name_impact_data)
 
-    # save aggregate of impact forecast
-    file_name_summary = base_path + '/' + build_file_name_from_impact_forecast(impact_forecast, impact_type, 'summary.json')
-    summary = summarize_impact(impact_forecast, impact_type, hazard_metadata, hazard_source)
-    with open(file_name_summary, 'w') as file:
-        json.dump(summary, file, indent=4)  # indent=4 for pretty printing
+        # save impact forecast matrix
+        # the keys written by save_npz are a superset of those read by Climada's Impact.read_sparse_csr
+        future_matrix = executor.submit(save_npz, file_name_impact_matrix, impact_data.imp_mat.tocsr(),
+                                        compressed=False)
 
-    # save polygon of impact forecast
-    file_name_polygon = base_path + '/' + build_file_name_from_impact_forecast(impact_forecast, impact_type, 'polygon.geojson')
-    polygons = create_polygons_from_impact(impact_forecast)
-    polygons.to_file(file_name_polygon, driver='GeoJSON')
+        # save aggregate of impact forecast
+        future_summary = executor.submit(_write_summary, summary, file_name_summary)
 
+        # save polygon of impact forecast; the polygons are created while the other files are written
+        polygons = create_polygons_from_impact(impact_forecast, impact=impact_data)
+        future_polygon = executor.submit(polygons.to_file, file_name_polygon, driver='GeoJSON',
+                                         engine='pyogrio')
+
+        # propagate errors of the writes
+        for future in (future_data, future_matrix, future_summary, future_polygon):
+            future.result()
 
     return file_name_impact_data, file_name_impact_matrix, file_name_summary, file_name_polygon
 
 
+def _write_summary(summary: dict[str, Any], file_name: str) -> None:
+    # serialize in one go; OPT_INDENT_2 for pretty printing, OPT_SERIALIZE_NUMPY for numpy scalars
+    Path(file_name).write_bytes(orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+
+
 def summarize_impact(impact_forecast: Forecast,
+                     impact: Impact,
                      impact_type: str,
                      hazard_metadata: HazardMetadata,
                      hazard_source: HazardSource) -> dict[str, Any]:
     """
     Creates a summary of the specified impact forecast as a dictionary.
+    The impact is the one extracted from the impact forecast (see _extract_impact).
     The impact type is passed directly, the event name is taken from the specified metadata.
     The summary includes the following keys:
     * countryName: name of the country that the impact has been calculated for
@@ -79,10 +108,10 @@ def summarize_impact(impact_forecast: Forecast,
     * mean, min, max, median: mean, minimum, maximum and median value of impact
     * 05perc, 25perc, 75perc, 95perc: percentiles of impact
     """
-    impact = _extract_impact(impact_forecast)
-
-    weighted_statistics = DescrStatsW(data=impact.at_event, weights=impact.frequency)
-    percentiles = weighted_statistics.quantile(probs=[0.05, 0.25, 0.5, 0.75, 0.95])
+    mean, minimum, maximum, quantiles = _calculate_weighted_statistics(impact.at_event, impact.frequency,
+                                                                       _PERCENTILE_PROBABILITIES)
+    # python floats in the order of _PERCENTILE_PROBABILITIES
+    p05, p25, p50, p75, p95 = quantiles.tolist()
 
     return {'countryName': impact_forecast.exposure_name,
             'hazardType': hazard_source.type,
@@ -91,34 +120,59 @@ def summarize_impact(impact_forecast: Forecast,
             'eventDate': impact_forecast.event_date.strftime('%Y%m%d%H'),
             'eventName': hazard_metadata.event_name,
             'leadTime': convert_timedelta_to_days(impact_forecast.lead_time()),
-            'mean': _round_value(impact_forecast.ai_agg(), _ROUND),
-            'min': _round_value(impact.at_event.min(), _ROUND_DOWN),
-            'max': _round_value(impact.at_event.max(), _ROUND_UP),
-            'median': _round_value(percentiles[0.5], _ROUND),
-            '05perc': _round_value(percentiles[0.05], _ROUND_DOWN),
-            '25perc': _round_value(percentiles[0.25], _ROUND_DOWN),
-            '75perc': _round_value(percentiles[0.75], _ROUND_UP),
-            '95perc': _round_value(percentiles[0.95], _ROUND_UP),
+            'mean': _round_value(mean, _ROUND),
+            'min': _round_value(minimum, _ROUND_DOWN),
+            'max': _round_value(maximum, _ROUND_UP),
+            'median': _round_value(p50, _ROUND),
+            '05perc': _round_value(p05, _ROUND_DOWN),
+            '25perc': _round_value(p25, _ROUND_DOWN),
+            '75perc': _round_value(p75, _ROUND_UP),
+            '95perc': _round_value(p95, _ROUND_UP),
             'productStatus': 'alpha',
             'weatherModel': hazard_source.provider,
             'impactUnit': impact.unit,
             }
 
 
+def _calculate_weighted_statistics(values: np.ndarray,
+                                   weights: np.ndarray,
+                                   probs: Sequence[float]) -> tuple[float, float, float, np.ndarray]:
+    """
+    Calculates weighted mean, minimum, maximum and weighted quantiles of the specified values with a single sort.
+    The weighted mean is the weighted sum of the values as in Forecast.ai_agg() (i.e. the impact's aai_agg),
+    which is the mean since the frequencies of an impact forecast sum up to 1.
+    The quantiles follow the definition of statsmodels' DescrStatsW.quantile (SAS definition):
+    weights of equal values are aggregated and the mean of two adjacent values is taken
+    if the cumulative weight exactly hits the target.
+    """
+    unique_values, inverse = np.unique(values, return_inverse=True)
+    aggregated_weights = np.bincount(inverse, weights=weights)
+    cumulative_weights = np.cumsum(aggregated_weights)
+    mean = np.dot(unique_values, aggregated_weights)
+    targets = np.asarray(probs) * cumulative_weights[-1]
+    # search with tolerance so that exact hits do not depend on the rounding of the cumulative sum
+    indices = np.searchsorted(cumulative_weights, targets - _EXACT_HIT_TOLERANCE)
+
+    quantiles = unique_values[indices].astype(float)
+    exact_hits = ((np.abs(targets - cumulative_weights[indices]) < _EXACT_HIT_TOLERANCE)
+                  & (indices < len(cumulative_weights) - 1))
+    quantiles[exact_hits] = (unique_values[indices[exact_hits]] + unique_values[indices[exact_hits] + 1]) / 2
+
+    return mean, unique_values[0], unique_values[-1], quantiles
+
+
 def _extract_impact(impact_forecast: Forecast) -> Impact:
     if len(impact_forecast.hazard) != 1:
         raise ClimadaError(f'Impact forecast does not contain one hazard, but: {len(impact_forecast.hazard)}')
-    hazard = impact_forecast.hazard[0]
-    try:
-        impact = impact_forecast._impact[impact_forecast.hazard.index(hazard)]
-    except Exception as error:
-        raise ClimadaError('Impact forecast does not contain impact for hazard.') from error
-    return impact
+    if not impact_forecast._impact:
+        raise ClimadaError('Impact forecast does not contain impact for hazard.')
+    # the only hazard is the first one, so its impact is the first one as well
+    return impact_forecast._impact[0]
 
 
 def _round_value(value: float, mode: str) -> float:
-    if CONFIG.climada.rounding.significant_digits:
-        return _round_significant(value, significant=CONFIG.climada.rounding.significant_digits, rounding_mode=mode)
+    if _SIGNIFICANT_DIGITS:
+        return _round_significant(value, significant=_SIGNIFICANT_DIGITS, rounding_mode=mode)
     return value
 
 
@@ -132,7 +186,16 @@ def _round_significant(number: float, significant: int, rounding_mode: str) -> f
     if significant <= 0:
         raise AssertionError(f'Number of significant digits is not positive: {significant}')
 
-    rounded_number = Context(prec=significant, rounding=rounding_mode).create_decimal(str(number))
+    rounded_number = _rounding_context(significant, rounding_mode).create_decimal(str(number))
+
+    # a number rounded to zero has no digits left of decimal point (its log10 is -Infinity)
+    if not rounded_number:
+        return float(rounded_number)
+    # return int if all significant digits are left of decimal point;
+    # the adjusted exponent is the integer part of log10 without computing the logarithm
+    return int(rounded_number) if rounded_number.adjusted() + 1 >= significant else float(rounded_number)
+
 
-    # return int if all significant digits are left of decimal point
-    return int(rounded_number) if rounded_number.log10() + 1 >= significant else float(rounded_number)
+@lru_cache(maxsize=None)
+def _rounding_context(significant: int, rounding_mode: str) -> Context:
+    return Context(prec=significant, rounding=rounding_mode)
@@ -6,7 +6,8 @@ https://stackoverflow.com/questions/13703720/converting-between-datetime-timesta
 import datetime as dt
 
 import numpy as np
-import pandas as pd
+
+from w4un_hydromet_impact.util.types import TimestampArray
 
 _SECONDS_PER_DAY = 24 * 60 * 60
 
@@ -14,8 +15,16 @@ _SECONDS_PER_DAY = 24 * 60 * 60
 def convert_datetime64_to_datetime(value: np.datetime64) -> dt.datetime:
     """
     Converts a datetime64 object into a datetime object.
+    Like datetime objects, the result has got microsecond resolution.
+    """
+    return value.astype('datetime64[us]').item()
+
+
+def convert_datetime64_array_to_datetimes(values: TimestampArray) -> list[dt.datetime]:
+    """
+    Converts an array of datetime64 objects into a list of datetime objects.
     """
-    return pd.Timestamp(value).to_pydatetime()
+    return values.astype('datetime64[us]').tolist()
 
 
 def convert_timedelta_to_days(value: dt.timedelta) -> float:
@@ -29,5 +38,5 @@ def create_datetime64(year: int, month: int, day: int, hour: int = 0, minute: in
     """
     Creates a datetime64 from year, month, day, hour and minute.
     """
-    datetime = dt.datetime(year, month, day, hour, minute)
-    return np.datetime64(datetime.strftime('%Y-%m-%dT%H:%M:%S.%f000'))
+    # keep nanosecond resolution
+    return np.datetime64(dt.datetime(year, month, day, hour, minute), 'ns')
@@ -3,7 +3,7 @@ Utilities for dictionary not available via Python.
 
 TODO: replace with standard libraries when available.
 """
-from typing import TypeVar, Iterable
+from typing import AbstractSet, TypeVar, Iterable
 
 _K = TypeVar('_K')
 _V = TypeVar('_V')
@@ -22,6 +22,7 @@ def remove_keys(dictionary: dict[_K, _V], keys_to_remove: Iterable[_K]) -> dict[
     """
     Returns a new dictionary containing the entries of the specified one, but without the specified keys to remove.
     """
+    keys_to_remove = _as_set(keys_to_remove)
     return {key: value
             for key, value in dictionary.items()
             if key not in keys_to_remove}
@@ -30,7 +31,17 @@ def remove_keys(dictionary: dict[_K, _V], keys_to_remove: Iterable[_K]) -> dict[
 def retain_keys(dictionary: dict[_K, _V], keys_to_retain: Iterable[_K]) -> dict[_K, _V]:
     """
     Returns a new dictionary containing the entries of the specified one, but only with the specified keys to retain.
+    The entries are ordered like the keys to retain.
     """
-    return {key: value
-            for key, value in dictionary.items()
-            if key in keys_to_retain}
+    # iterate over the keys to retain which are usually fewer than the entries of the dictionary
+    return {key: dictionary[key]
+            for key in keys_to_retain
+            if key in dictionary}
+
+
+def _as_set(keys: Iterable[_K]) -> AbstractSet[_K]:
+    """
+    Returns the specified keys as set in order to look them up in constant time.
+    Sets (including dictionary views of keys) are returned as they are.
+    """
+    return keys if isinstance(keys, AbstractSet) else frozenset(keys)
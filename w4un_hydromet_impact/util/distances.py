@@ -1,12 +1,25 @@
+from functools import lru_cache
+
+import numpy as np
+import shapely
 from geopy.distance import distance
 from shapely import Point
 from shapely.geometry.base import BaseGeometry
 
+from w4un_hydromet_impact.util.types import FloatingArray
+
 
 def calculate_kilometers_for_latitude(latitude: float) -> float:
     """
     Calculates the kilometers per degree on the specified latitude.
+    The latitude is rounded to a hundredth of a degree so that the result can be cached.
     """
+    return _calculate_kilometers_for_latitude_in_hundredths(round(latitude * 100))
+
+
+@lru_cache(maxsize=4096)
+def _calculate_kilometers_for_latitude_in_hundredths(latitude_in_hundredths: int) -> float:
+    latitude = latitude_in_hundredths / 100
     return distance((latitude, 0), (latitude, 1)).kilometers
 
 
@@ -17,3 +30,27 @@ def calculate_distance_between_point_and_geometry(geometry: BaseGeometry,
     """
     point = Point(longitude, latitude)
     return geometry.distance(point) * calculate_kilometers_for_latitude(latitude)
+
+
+def calculate_distances_between_points_and_geometry(geometry: BaseGeometry,
+                                                    latitudes: FloatingArray,
+                                                    longitudes: FloatingArray) -> FloatingArray:
+    """
+    Calculates the distances between several points and a geometry object in kilometers.
+    The distances are the same as calculated by calculate_distance_between_point_and_geometry for each point.
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    points = shapely.points(longitudes, latitudes)
+    return shapely.distance(geometry, points) * _calculate_kilometers_for_latitudes(latitudes)
+
+
+def _calculate_kilometers_for_latitudes(latitudes: FloatingArray) -> FloatingArray:
+    """
+    Calculates the kilometers per degree on the specified latitudes (see calculate_kilometers_for_latitude).
+    Each distinct latitude is looked up only once.
+    """
+    # np.round rounds half to even like round
+    latitudes_in_hundredths, inverse = np.unique(np.round(latitudes * 100).astype(np.int64), return_inverse=True)
+    kilometers = np.array([_calculate_kilometers_for_latitude_in_hundredths(latitude_in_hundredths)
+                           for latitude_in_hundredths in latitudes_in_hundredths.tolist()], dtype=np.float64)
+    return kilometers[inverse.ravel()]
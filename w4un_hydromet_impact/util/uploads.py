@@ -1,13 +1,11 @@
 """
 This module provides methods to upload common data into S3 during processing.
 """
-import json
 import logging
-import os
-from io import BytesIO, TextIOWrapper
-from tempfile import NamedTemporaryFile
+from io import BytesIO
 from typing import Any
 
+import orjson
 from geopandas import GeoSeries
 from matplotlib import pyplot as plt
 from matplotlib.figure import Figure
@@ -22,10 +20,11 @@ logger = logging.getLogger(__name__)
 def upload_json(obj: Any, s3_location: S3Location) -> None:
     """
     Uploads the specified object as JSON file into the specified location.
+    Keys of dictionaries that are not strings (e.g. numeric country codes) are converted to strings.
+    NaN and infinite numbers are written as null since they are not valid in JSON.
     """
-    with BytesIO() as file, TextIOWrapper(file, encoding='utf-8') as wrapper:
-        json.dump(obj, wrapper, indent=4)
-        wrapper.flush()
+    content = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    with BytesIO(content) as file:
         upload_file(file, s3_location)
 
 
@@ -33,29 +32,27 @@ def upload_geo_object(geo_object: GeoSeries, s3_location: S3Location) -> None:
     """
     Uploads the specified geo object as JSON file into the specified location.
     """
-    # to_file supports file name only; alternatives do not support driver
-    with NamedTemporaryFile(mode='w+') as tmp_file:
-        geo_object.to_file(tmp_file.name, driver='GeoJSON')
-        tmp_file.flush()
-        # cannot pass tmp_file directly because it is text-based
-        with open(tmp_file.name, 'rb') as file:
-            upload_file(file, s3_location)
+    # serialize in memory to avoid the round trip via a temporary file
+    with BytesIO(geo_object.to_json().encode('utf-8')) as file:
+        upload_file(file, s3_location)
 
 
 def upload_figure(figure: Figure, s3_location: S3Location) -> None:
     """
     Upload the specified figure into the specified location.
     """
-    with NamedTemporaryFile(mode='w+b') as tmp_file:
+    with BytesIO() as file:
         try:
-            figure.savefig(tmp_file)
+            figure.savefig(file)
         except Exception as error:
             raise PlottingError(f'Cannot serialize figure for file {s3_location.file_name}.') from error
-        file_size = os.stat(tmp_file.name).st_size
-        upload_file(tmp_file, s3_location)
+        finally:
+            # release the canvas before the upload rather than after it
+            # https://stackoverflow.com/questions/8213522/when-to-use-cla-clf-or-close-for-clearing-a-plot
+            figure.clear()
+            plt.close(figure)
+        file_size = file.getbuffer().nbytes
+        file.seek(0)
+        upload_file(file, s3_location)
 
         logger.info('Done with plotting %s bytes.', file_size)
-
-    # https://stackoverflow.com/questions/8213522/when-to-use-cla-clf-or-close-for-clearing-a-plot
-    figure.clear()
-    plt.close(figure)